@@ -3,12 +3,24 @@ Precedent Finder Application
 A full-fledged Python web application for searching legal precedents.
 """
 
+import functools
+import hashlib
+import heapq
+import operator
 import os
+import sqlite3
+import orjson
 from flask import Flask, render_template, request, jsonify
+from flask.json.provider import JSONProvider
 from flask_sqlalchemy import SQLAlchemy
-from datetime import datetime
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.exc import DatabaseError
+from sqlalchemy.schema import CreateColumn
 from dotenv import load_dotenv
-from utils import sanitize_search_query
+from utils import (
+    normalize_query, build_fts_query, escape_like, encode_cursor, decode_cursor,
+    complete_prefix, TTLCache,
+)
 
 # Load environment variables
 load_dotenv()
@@ -16,18 +28,113 @@ load_dotenv()
 # Initialize Flask app
 app = Flask(__name__)
 
+class ORJSONProvider(JSONProvider):
+    """JSON provider backed by orjson for jsonify() and request.get_json()."""
+
+    options = orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, option=self.options).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        # Hand orjson's bytes straight to the response, skipping a str round-trip
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, option=self.options), mimetype='application/json'
+        )
+
+
+app.json = ORJSONProvider(app)
+
 # Configuration
 app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'dev-secret-key-change-this')
 app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL', 'sqlite:///precedents.db')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
+# Keep a warm, process-wide connection pool so requests do not pay connect
+# (and, on PostgreSQL, TCP + auth) costs. In-memory SQLite uses a single
+# static connection and rejects pool sizing, so it keeps the defaults.
+database_url = make_url(app.config['SQLALCHEMY_DATABASE_URI'])
+if database_url.get_backend_name() != 'sqlite':
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+        'pool_size': 20,
+        'max_overflow': 10,
+        'pool_pre_ping': True,
+        'pool_recycle': 1800,
+    }
+elif database_url.database not in (None, '', ':memory:'):
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+        'pool_size': 20,
+        'max_overflow': 10,
+    }
+
+# Search query bounds. Three characters is the shortest pattern a trigram
+# index can serve; the upper cap keeps pathological patterns out of the DB.
+MIN_QUERY_LENGTH = 3
+MAX_QUERY_LENGTH = 128
+# Raw queries are cut to this before normalizing, leaving slack for the
+# whitespace normalizing collapses, so oversized input is never split or
+# memoized in full
+MAX_RAW_QUERY_LENGTH = 2 * MAX_QUERY_LENGTH
+
+# Pagination bounds: rows per page, and the deepest OFFSET a search may use
+MAX_PER_PAGE = 50
+MAX_OFFSET = 1000
+
+# Characters of the description returned with each search result
+DESCRIPTION_SNIPPET_LENGTH = 200
+
+# Fields a submitted precedent must and may carry, and the most precedents
+# accepted by one POST
+REQUIRED_FIELDS = ('title', 'case_number', 'year', 'court', 'description')
+OPTIONAL_FIELDS = ('keywords', 'section', 'article')
+MAX_BULK_PRECEDENTS = 1000
+
+# Completions returned per /api/suggestions call
+SUGGESTION_LIMIT = 5
+
 # Initialize database
 db = SQLAlchemy(app)
 
 
+@db.event.listens_for(Engine, 'connect')
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Tune SQLite connections for throughput.
+
+    WAL with synchronous=NORMAL avoids an fsync per committed transaction
+    and lets readers run alongside a writer. The larger page cache (64 MiB),
+    in-memory temp tables and memory-mapped reads (256 MiB) keep hot pages
+    out of read() syscalls.
+    """
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+    cursor = dbapi_connection.cursor()
+    cursor.execute('PRAGMA journal_mode=WAL')
+    cursor.execute('PRAGMA synchronous=NORMAL')
+    cursor.execute('PRAGMA cache_size=-65536')
+    cursor.execute('PRAGMA temp_store=MEMORY')
+    cursor.execute('PRAGMA mmap_size=268435456')
+    cursor.close()
+
+
 # Database Models
 class Precedent(db.Model):
     """Model for storing legal precedents."""
+    # (column, id) indexes serve each sort order and its keyset pagination;
+    # the year and court ones also back the year filter and stats grouping.
+    # SQLite needs no title one: id is the rowid, which every SQLite index
+    # ends in, so the unique title index already covers (title, id). B-trees
+    # are walked backwards for descending sorts.
+    __table_args__ = (
+        db.Index('ix_precedent_year_id', 'year', 'id'),
+        db.Index('ix_precedent_court_id', 'court', 'id'),
+    ) + ((
+        db.Index('ix_precedent_title_id', 'title', 'id'),
+    ) if database_url.get_backend_name() != 'sqlite' else ())
+
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(255), nullable=False, unique=True)
     case_number = db.Column(db.String(100), nullable=False)
@@ -37,8 +144,30 @@ class Precedent(db.Model):
     keywords = db.Column(db.String(500))
     section = db.Column(db.String(100))
     article = db.Column(db.String(100))
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Every searchable field concatenated into one column, so the non-FTS
+    # search path needs a single ILIKE (and a single trigram index). SQLite
+    # searches through FTS5 and never reads it, so there it is VIRTUAL and
+    # takes no space in the row.
+    search_blob = db.deferred(db.Column(db.Text, db.Computed(
+        title + ' ' + case_number + ' ' + description
+        + ' ' + db.func.coalesce(keywords, '')
+        + ' ' + db.func.coalesce(section, '')
+        + ' ' + db.func.coalesce(article, ''),
+        persisted=database_url.get_backend_name() != 'sqlite'
+    )))
+    # Lowercased /api/suggestions terms, one per line, derived on write so
+    # building the suggestion list never re-tokenizes rows
+    suggest_terms = db.deferred(db.Column(db.Text))
+    # now() is also rendered into every INSERT, because tables created before
+    # the server defaults existed lack them and SQLite cannot add them later
+    created_at = db.Column(
+        db.DateTime(timezone=True), default=db.func.now(),
+        server_default=db.func.now(), nullable=False
+    )
+    updated_at = db.Column(
+        db.DateTime(timezone=True), default=db.func.now(),
+        server_default=db.func.now(), onupdate=db.func.now(), nullable=False
+    )
 
     def to_dict(self):
         """Convert model to dictionary."""
@@ -58,25 +187,351 @@ class Precedent(db.Model):
         return f'<Precedent {self.title}>'
 
 
+def extract_suggest_terms(title, keywords=None, section=None, article=None):
+    """Collect the suggestion terms of a precedent as a newline-joined string.
+
+    Keywords, section and article are kept as whole phrases, the title is
+    split into words of three or more characters.
+    """
+    terms = set()
+    if keywords:
+        terms.update(kw.strip().lower() for kw in keywords.split(','))
+    if section:
+        terms.add(section.lower())
+    if article:
+        terms.add(article.lower())
+    terms.update(word.lower() for word in title.split() if len(word) > 2)
+    terms.discard('')
+    return '\n'.join(sorted(terms))
+
+
+@db.event.listens_for(Precedent, 'before_insert')
+@db.event.listens_for(Precedent, 'before_update')
+def set_suggest_terms(mapper, connection, target):
+    """Keep suggest_terms in step with the fields it is derived from."""
+    target.suggest_terms = extract_suggest_terms(
+        target.title, target.keywords, target.section, target.article
+    )
+
+
+# Columns returned by search results: the fields of Precedent.to_dict(),
+# with the description cut to a snippet (/api/precedent/<id> has the full text)
+RESULT_COLUMNS = (
+    Precedent.id, Precedent.title, Precedent.case_number, Precedent.year,
+    Precedent.court,
+    db.func.substr(Precedent.description, 1, DESCRIPTION_SNIPPET_LENGTH).label('description'),
+    Precedent.keywords, Precedent.section, Precedent.article,
+)
+
+# One precedent by id, with every to_dict() field and the full description
+PRECEDENT_BY_ID = db.select(
+    Precedent.id, Precedent.title, Precedent.case_number, Precedent.year,
+    Precedent.court, Precedent.description, Precedent.keywords,
+    Precedent.section, Precedent.article,
+).where(Precedent.id == db.bindparam('id'))
+
+
+# Full-text search index (SQLite only). precedent_fts is an FTS5
+# external-content table over the searchable Precedent columns, kept in sync
+# by triggers. It is not part of db.metadata, so create_all()/drop_all()
+# leave it alone; this lightweight handle is only used to build queries.
+SEARCH_COLUMNS = ('title', 'description', 'keywords', 'case_number', 'section', 'article')
+precedent_fts = db.table('precedent_fts', db.column('rowid'), db.column('precedent_fts'))
+
+
+def create_search_index():
+    """Create the dialect-specific search index if missing.
+
+    SQLite gets the FTS5 table and its sync triggers; PostgreSQL gets a
+    pg_trgm GIN index on search_blob so the ILIKE fallback can use it.
+    """
+    if db.engine.dialect.name == 'postgresql':
+        create_trigram_indexes()
+        return
+    if db.engine.dialect.name != 'sqlite':
+        return
+
+    exists = db.session.execute(db.text(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'precedent_fts'"
+    )).first()
+    
+    columns = ', '.join(SEARCH_COLUMNS)
+    new_values = ', '.join(f'new.{column}' for column in SEARCH_COLUMNS)
+    old_values = ', '.join(f'old.{column}' for column in SEARCH_COLUMNS)
+    insert_new = f"INSERT INTO precedent_fts(rowid, {columns}) VALUES (new.id, {new_values});"
+    delete_old = (
+        f"INSERT INTO precedent_fts(precedent_fts, rowid, {columns}) "
+        f"VALUES ('delete', old.id, {old_values});"
+    )
+
+    statements = [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS precedent_fts USING fts5("
+        f"{columns}, content='precedent', content_rowid='id', "
+        f"tokenize='unicode61 remove_diacritics 2')",
+        f"CREATE TRIGGER IF NOT EXISTS precedent_fts_ai AFTER INSERT ON precedent "
+        f"BEGIN {insert_new} END",
+        f"CREATE TRIGGER IF NOT EXISTS precedent_fts_ad AFTER DELETE ON precedent "
+        f"BEGIN {delete_old} END",
+        f"CREATE TRIGGER IF NOT EXISTS precedent_fts_au AFTER UPDATE ON precedent "
+        f"BEGIN {delete_old} {insert_new} END",
+    ]
+    for statement in statements:
+        db.session.execute(db.text(statement))
+    if not exists:
+        # Index any rows written before the FTS table existed
+        db.session.execute(db.text("INSERT INTO precedent_fts(precedent_fts) VALUES ('rebuild')"))
+    db.session.commit()
+
+
+def create_trigram_indexes():
+    """Create the pg_trgm GIN indexes backing the ILIKE search and court filter on PostgreSQL."""
+    db.session.execute(db.text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    db.session.execute(db.text(
+        "CREATE INDEX IF NOT EXISTS precedent_search_blob_trgm "
+        "ON precedent USING gin (search_blob gin_trgm_ops)"
+    ))
+    db.session.execute(db.text(
+        "CREATE INDEX IF NOT EXISTS precedent_court_trgm "
+        "ON precedent USING gin (court gin_trgm_ops)"
+    ))
+    db.session.commit()
+
+
+def drop_search_index():
+    """Drop the FTS5 search index, which drop_all() does not know about."""
+    if db.engine.dialect.name != 'sqlite':
+        return
+
+    db.session.execute(db.text("DROP TABLE IF EXISTS precedent_fts"))
+    db.session.commit()
+
+
+def optimize_search_index():
+    """Merge the FTS5 index b-trees into one after a bulk load."""
+    if db.engine.dialect.name != 'sqlite':
+        return
+
+    db.session.execute(db.text("INSERT INTO precedent_fts(precedent_fts) VALUES ('optimize')"))
+    db.session.commit()
+
+
+def upgrade_schema():
+    """Add the columns and indexes an older precedent table is missing.
+
+    create_all() skips tables that already exist, so a database created by
+    an earlier version keeps its old shape. Missing columns are added in
+    place, suggest_terms is backfilled, and timestamps left NULL by earlier
+    upgraded inserts are filled in; updated_at is kept as is throughout. A
+    column the database cannot add to an existing table raises RuntimeError
+    asking for a reset.
+    """
+    table = Precedent.__table__
+    existing = {column['name'] for column in db.inspect(db.engine).get_columns(table.name)}
+    missing = [column for column in table.columns if column.name not in existing]
+
+    for column in missing:
+        ddl = CreateColumn(column).compile(dialect=db.engine.dialect)
+        try:
+            db.session.execute(db.text(f'ALTER TABLE {table.name} ADD COLUMN {ddl}'))
+        except DatabaseError as e:
+            db.session.rollback()
+            raise RuntimeError(
+                f'The {table.name} table predates the {column.name} column, which '
+                f'could not be added ({e.orig}). Recreate the database with '
+                '`python manage.py init --reset` (this deletes all precedents).'
+            ) from e
+
+    for index in table.indexes:
+        index.create(db.session.connection(), checkfirst=True)
+
+    if any(column.name == 'suggest_terms' for column in missing):
+        rows = db.session.execute(db.select(
+            table.c.id, table.c.title, table.c.keywords, table.c.section, table.c.article
+        )).all()
+        if rows:
+            db.session.execute(
+                db.update(table)
+                .where(table.c.id == db.bindparam('row_id'))
+                .values(suggest_terms=db.bindparam('terms'), updated_at=table.c.updated_at),
+                [
+                    {'row_id': row.id, 'terms': extract_suggest_terms(
+                        row.title, row.keywords, row.section, row.article
+                    )}
+                    for row in rows
+                ],
+            )
+
+    # Older tables allow NULL timestamps; fall back on the other one if set
+    db.session.execute(
+        db.update(table)
+        .where(db.or_(table.c.created_at.is_(None), table.c.updated_at.is_(None)))
+        .values(
+            created_at=db.func.coalesce(table.c.created_at, table.c.updated_at, db.func.now()),
+            updated_at=db.func.coalesce(table.c.updated_at, table.c.created_at, db.func.now()),
+        )
+    )
+    db.session.commit()
+
+
+# Search statements are built once with a bound :q parameter, so requests
+# only bind a new value instead of rebuilding and re-keying the clause tree.
+# The FTS5 table is joined (rather than probed with IN) so results can be
+# ranked by bm25(), where lower scores are better matches.
+FTS_SEARCH = (
+    db.select(*RESULT_COLUMNS)
+    .join_from(Precedent, precedent_fts, precedent_fts.c.rowid == Precedent.id)
+    .where(precedent_fts.c.precedent_fts.op('MATCH')(db.bindparam('q')))
+)
+FTS_RANK = db.func.bm25(db.literal_column('precedent_fts'))
+
+# Sortable columns; each is paired with id for keyset pagination
+SORT_COLUMNS = {
+    'year': Precedent.year,
+    'title': Precedent.title,
+    'court': Precedent.court,
+}
+
+# Python type of each sort column's values, for validating cursors
+SORT_VALUE_TYPES = {'year': int, 'title': str, 'court': str}
+
+# Integers sqlite3 and PostgreSQL bigint can bind
+INT64_MIN, INT64_MAX = -2**63, 2**63 - 1
+
+# Fallback for databases without FTS5: substring match on search_blob
+LIKE_SEARCH = db.select(*RESULT_COLUMNS).where(
+    Precedent.search_blob.ilike(db.bindparam('q'), escape='\\')
+)
+
+
+def search_statement(query):
+    """Return the base search statement and its parameters for a query."""
+    if db.engine.dialect.name == 'sqlite':
+        return FTS_SEARCH, {'q': build_fts_query(query)}
+    return LIKE_SEARCH, {'q': f'%{escape_like(query)}%'}
+
+
+# Pre-encoded bodies for the fixed error responses
+ERROR_QUERY_TOO_SHORT = orjson.dumps(
+    {'error': f'Search query must be at least {MIN_QUERY_LENGTH} characters'}
+)
+ERROR_PRECEDENT_NOT_FOUND = orjson.dumps({'error': 'Precedent not found'})
+ERROR_MISSING_FIELDS = orjson.dumps({'error': 'Missing required fields'})
+ERROR_TOO_MANY_PRECEDENTS = orjson.dumps(
+    {'error': f'At most {MAX_BULK_PRECEDENTS} precedents can be created per request'}
+)
+ERROR_INVALID_PAGINATION = orjson.dumps({'error': 'page and per_page must be integers'})
+ERROR_PAGE_TOO_DEEP = orjson.dumps({
+    'error': f'Pages past row {MAX_OFFSET} are not available; '
+             'page through with the cursor parameter instead'
+})
+ERROR_INVALID_CURSOR = orjson.dumps({'error': 'Invalid pagination cursor'})
+ERROR_CURSOR_RELEVANCE = orjson.dumps(
+    {'error': 'Cursor pagination is not supported when sorting by relevance'}
+)
+ERROR_NOT_FOUND = orjson.dumps({'error': 'Resource not found'})
+ERROR_SERVER = orjson.dumps({'error': 'Internal server error'})
+
+
+def error_response(body, status):
+    """Wrap a pre-encoded JSON error body in a response."""
+    return app.response_class(body, status=status, mimetype='application/json')
+
+
+# Short-lived caches for the read-only endpoints. Entries expire on their
+# own, which bounds staleness when another process (e.g. manage.py) writes.
+search_cache = TTLCache(maxsize=1024, ttl=60)
+stats_cache = TTLCache(maxsize=1, ttl=300)
+precedent_cache = TTLCache(maxsize=1024, ttl=300)
+empty_query_cache = TTLCache(maxsize=4096, ttl=60)
+# Totals depend only on the match and filters, so every page, sort and
+# cursor of the same search shares one count
+count_cache = TTLCache(maxsize=1024, ttl=60)
+suggestion_cache = TTLCache(maxsize=1, ttl=300)
+# Autocomplete prefixes are heavily skewed towards a few short ones
+suggestion_prefix_cache = TTLCache(maxsize=2048, ttl=300)
+
+
+def invalidate_caches():
+    """Drop cached read results after the precedent table changes."""
+    search_cache.clear()
+    stats_cache.clear()
+    precedent_cache.clear()
+    empty_query_cache.clear()
+    count_cache.clear()
+    suggestion_cache.clear()
+    suggestion_prefix_cache.clear()
+
+
 # Routes
+@functools.lru_cache(maxsize=1)
+def render_index():
+    """Render and encode the landing page once; its only variable is a constant.
+
+    Returns the body along with an ETag derived from it.
+    """
+    body = render_template('index.html', snippet_length=DESCRIPTION_SNIPPET_LENGTH).encode()
+    return body, hashlib.sha1(body).hexdigest()
+
+
 @app.route('/')
 def index():
     """Landing page with search box."""
-    return render_template('index.html')
+    body, etag = render_index()
+    response = app.response_class(body, mimetype='text/html')
+    response.headers['Cache-Control'] = 'public, max-age=3600'
+    response.set_etag(etag)
+    # Answers a matching If-None-Match with an empty 304
+    return response.make_conditional(request)
+
+
+def int_arg(name, default, lo, hi=None):
+    """Read an integer query parameter, clamped to [lo, hi].
+
+    Raises ValueError if the parameter is present but not an integer.
+    """
+    value = request.args.get(name)
+    if not value:
+        return default
+    number = max(lo, int(value))
+    return number if hi is None else min(number, hi)
+
+
+def valid_cursor(after, sort_by):
+    """Check a decoded cursor is a [sort value, id] pair the database can bind.
+
+    Cursors come back from clients, so anything else (wrong types, bools,
+    ids outside the signed 64-bit range) is treated as tampered.
+    """
+    if not (isinstance(after, list) and len(after) == 2):
+        return False
+    value, precedent_id = after
+    if type(precedent_id) is not int or not INT64_MIN <= precedent_id <= INT64_MAX:
+        return False
+    if SORT_VALUE_TYPES[sort_by] is int:
+        return type(value) is int and INT64_MIN <= value <= INT64_MAX
+    return type(value) is str
 
 
 @app.route('/api/search', methods=['GET'])
 def search():
     """API endpoint for searching precedents."""
-    query = request.args.get('q', '').strip()
-    query = sanitize_search_query(query)
+    query = request.args.get('q', '')
+    # Normalizing never lengthens a query, so reject short ones without it
+    if len(query) < MIN_QUERY_LENGTH:
+        return error_response(ERROR_QUERY_TOO_SHORT, 400)
     
-    if not query or len(query) < 2:
-        return jsonify({'error': 'Search query must be at least 2 characters'}), 400
+    query = normalize_query(query[:MAX_RAW_QUERY_LENGTH])[:MAX_QUERY_LENGTH].rstrip()
+    if len(query) < MIN_QUERY_LENGTH:
+        return error_response(ERROR_QUERY_TOO_SHORT, 400)
     
-    # Get pagination parameters
-    page = int(request.args.get('page', 1))
-    per_page = int(request.args.get('per_page', 20))
+    # Get pagination parameters, capping page size and refusing deep scans
+    try:
+        per_page = int_arg('per_page', 20, 1, MAX_PER_PAGE)
+        page = int_arg('page', 1, 1)
+    except ValueError:
+        return error_response(ERROR_INVALID_PAGINATION, 400)
+    if (page - 1) * per_page > MAX_OFFSET and not request.args.get('cursor'):
+        return error_response(ERROR_PAGE_TOO_DEEP, 400)
     
     # Get filter parameters
     filter_year = request.args.get('year')
@@ -85,64 +540,181 @@ def search():
     # Get sorting parameters
     sort_by = request.args.get('sort', 'year')
     sort_order = request.args.get('order', 'desc')
+    if sort_by == 'relevance' and db.engine.dialect.name != 'sqlite':
+        sort_by = 'year'  # bm25 ranking needs the FTS5 index
+    if sort_by != 'relevance' and sort_by not in SORT_COLUMNS:
+        sort_by, sort_order = 'year', 'desc'  # Default
+    if sort_order != 'desc':
+        sort_order = 'asc'
     
-    # Build base query
-    base_query = Precedent.query.filter(
-        db.or_(
-            Precedent.title.ilike(f'%{query}%'),
-            Precedent.description.ilike(f'%{query}%'),
-            Precedent.keywords.ilike(f'%{query}%'),
-            Precedent.case_number.ilike(f'%{query}%'),
-            Precedent.section.ilike(f'%{query}%'),
-            Precedent.article.ilike(f'%{query}%')
-        )
+    # An opaque cursor continues from the last row of a previous page
+    after = None
+    cursor = request.args.get('cursor')
+    if cursor:
+        if sort_by == 'relevance':
+            return error_response(ERROR_CURSOR_RELEVANCE, 400)
+        try:
+            after = decode_cursor(cursor)
+        except ValueError:
+            return error_response(ERROR_INVALID_CURSOR, 400)
+        if not valid_cursor(after, sort_by):
+            return error_response(ERROR_INVALID_CURSOR, 400)
+    
+    # Counting re-runs the whole match, so only do it when asked
+    include_total = request.args.get('include_total') == '1'
+    
+    # Matching is case-insensitive, so normalize the keys to raise the hit rate
+    normalized_query = query.lower()
+    
+    # A query known to match nothing stays empty under any filter, sort or page
+    if empty_query_cache.get(normalized_query):
+        payload = {'results': [], 'per_page': per_page, 'has_next': False, 'next_cursor': None}
+        if after is None:
+            payload['page'] = page
+        if include_total:
+            payload['total'] = 0
+            if after is None:
+                payload['pages'] = 0
+        return jsonify(payload)
+    
+    cache_key = (
+        normalized_query, page, per_page, filter_year,
+        filter_court.lower() if filter_court else None, sort_by, sort_order, cursor,
+        include_total
     )
+    # Cache the encoded body so hits skip serialization as well as the query
+    body = search_cache.get(cache_key)
+    if body is None:
+        payload = find_precedents(
+            query, per_page, filter_year, filter_court, sort_by, sort_order,
+            page=page, after=after, include_total=include_total
+        )
+        first_page = page == 1 and after is None
+        if not payload['results'] and first_page and not filter_year and not filter_court:
+            empty_query_cache.set(normalized_query, True)
+        body = orjson.dumps(payload, option=ORJSONProvider.options)
+        search_cache.set(cache_key, body)
+    
+    return app.response_class(body, mimetype='application/json')
+
+
+def find_precedents(query, per_page, filter_year, filter_court, sort_by, sort_order,
+                    page=1, after=None, include_total=False):
+    """Run a search and build the paginated response payload.
+
+    Pages are addressed either by number (OFFSET) or, when ``after`` holds
+    the (sort value, id) of the previous page's last row, by keyset. The
+    total match count costs a second scan, so it is only computed when
+    ``include_total`` is set.
+    """
+    # Start from the prebuilt statement; plain Core rows skip ORM instances
+    base, params = search_statement(query)
     
     # Apply filters
+    year = None
     if filter_year:
         try:
-            base_query = base_query.filter(Precedent.year == int(filter_year))
+            year = params['year'] = int(filter_year)
         except ValueError:
             pass  # Ignore invalid year
     
     if filter_court:
-        base_query = base_query.filter(Precedent.court.ilike(f'%{filter_court}%'))
+        # Match the court name literally; % and _ typed by the user are not wildcards
+        params['court'] = f'%{escape_like(filter_court)}%'
     
-    # Apply sorting
-    order_func = db.desc if sort_order == 'desc' else db.asc
-    if sort_by == 'year':
-        base_query = base_query.order_by(order_func(Precedent.year))
-    elif sort_by == 'title':
-        base_query = base_query.order_by(order_func(Precedent.title))
-    elif sort_by == 'court':
-        base_query = base_query.order_by(order_func(Precedent.court))
-    else:
-        base_query = base_query.order_by(db.desc(Precedent.year))  # Default
+    stmt, count_stmt = search_statements(
+        base, year is not None, bool(filter_court), sort_by, sort_order, after is not None
+    )
     
-    # Get total count before pagination
-    total = base_query.count()
+    # Count before sorting and pagination
+    if include_total:
+        count_key = (
+            query.lower(), filter_year, filter_court.lower() if filter_court else None
+        )
+        total = count_cache.get(count_key)
+        if total is None:
+            total = db.session.execute(count_stmt, params).scalar()
+            count_cache.set(count_key, total)
+    
+    # Fetch one extra row to learn whether more follow
+    params['limit'] = per_page + 1
+    if after is None:
+        params['offset'] = (page - 1) * per_page
+    else:
+        params['after_value'], params['after_id'] = after
+    rows = [dict(row) for row in db.session.execute(stmt, params).mappings()]
     
-    # Apply pagination
-    results = base_query.offset((page - 1) * per_page).limit(per_page).all()
+    next_cursor = None
+    has_next = len(rows) > per_page
+    if has_next:
+        del rows[per_page:]
+        if sort_by in SORT_COLUMNS:
+            next_cursor = encode_cursor([rows[-1][sort_by], rows[-1]['id']])
     
-    return jsonify({
-        'results': [result.to_dict() for result in results],
-        'total': total,
-        'page': page,
+    payload = {
+        'results': rows,
         'per_page': per_page,
-        'pages': (total + per_page - 1) // per_page if total > 0 else 0
-    })
+        'has_next': has_next,
+        'next_cursor': next_cursor,
+    }
+    if after is None:
+        payload['page'] = page
+    if include_total:
+        payload['total'] = total
+        if after is None:
+            payload['pages'] = (total + per_page - 1) // per_page if total > 0 else 0
+    return payload
+
+
+@functools.lru_cache(maxsize=None)
+def search_statements(base, by_year, by_court, sort_by, sort_order, keyset):
+    """Build the page and count statements for one shape of search.
+
+    Every per-request value (query, filters, cursor, limit and offset) is a
+    bound parameter, so each of the few dozen shapes is constructed once and
+    always hits SQLAlchemy's compiled statement cache.
+    """
+    stmt = base
+    if by_year:
+        stmt = stmt.where(Precedent.year == db.bindparam('year'))
+    if by_court:
+        stmt = stmt.where(Precedent.court.ilike(db.bindparam('court'), escape='\\'))
+    
+    # The count only needs the id of each match
+    count_stmt = db.select(db.func.count()).select_from(
+        stmt.with_only_columns(Precedent.id).subquery()
+    )
+    
+    # Apply sorting; id breaks ties so every row has a unique position
+    sort_column = SORT_COLUMNS.get(sort_by)
+    if sort_column is None:
+        stmt = stmt.order_by(FTS_RANK, Precedent.id)  # Best match first
+    else:
+        order_func = db.desc if sort_order == 'desc' else db.asc
+        stmt = stmt.order_by(order_func(sort_column), order_func(Precedent.id))
+    
+    # Apply pagination: seek past the cursor row, or skip whole pages
+    if keyset:
+        position = db.tuple_(sort_column, Precedent.id)
+        after = db.tuple_(db.bindparam('after_value'), db.bindparam('after_id'))
+        stmt = stmt.where(position < after if sort_order == 'desc' else position > after)
+    else:
+        stmt = stmt.offset(db.bindparam('offset'))
+    return stmt.limit(db.bindparam('limit')), count_stmt
 
 
 @app.route('/api/precedent/<int:precedent_id>', methods=['GET'])
 def get_precedent(precedent_id):
     """Get a specific precedent by ID."""
-    precedent = Precedent.query.get(precedent_id)
-
-    if not precedent:
-        return jsonify({'error': 'Precedent not found'}), 404
+    precedent = precedent_cache.get(precedent_id)
+    if precedent is None:
+        row = db.session.execute(PRECEDENT_BY_ID, {'id': precedent_id}).mappings().first()
+        if row is None:
+            return error_response(ERROR_PRECEDENT_NOT_FOUND, 404)
+        precedent = dict(row)
+        precedent_cache.set(precedent_id, precedent)
 
-    return jsonify(precedent.to_dict())
+    return jsonify(precedent)
 
 
 @app.route('/api/suggestions', methods=['GET'])
@@ -153,96 +725,206 @@ def get_suggestions():
     if len(prefix) < 2:
         return jsonify({'suggestions': []})
 
-    # Collect all searchable terms
-    terms = set()
+    suggestions = suggestion_prefix_cache.get(prefix)
+    if suggestions is None:
+        suggestions = complete_prefix(suggestion_terms(), prefix, SUGGESTION_LIMIT)
+        suggestion_prefix_cache.set(prefix, suggestions)
+    return jsonify({'suggestions': suggestions})
 
-    for precedent in Precedent.query.all():
-        # Add keywords
-        if precedent.keywords:
-            terms.update(kw.strip().lower() for kw in precedent.keywords.split(','))
-        # Add section terms
-        if precedent.section:
-            terms.add(precedent.section.lower())
-        # Add article terms
-        if precedent.article:
-            terms.add(precedent.article.lower())
-        # Add title words
-        terms.update(word.lower() for word in precedent.title.split() if len(word) > 2)
-
-    # Filter terms that start with prefix
-    suggestions = [term for term in terms if term.startswith(prefix)]
-    suggestions = sorted(set(suggestions))[:5]  # Remove duplicates, sort, limit to 5
 
-    return jsonify({'suggestions': suggestions})
+def suggestion_terms():
+    """Return the sorted suggestion terms, collecting them from the table if stale."""
+    terms = suggestion_cache.get('terms')
+    if terms is None:
+        collected = set()
+        for (row_terms,) in db.session.execute(db.select(Precedent.suggest_terms)):
+            if row_terms:
+                collected.update(row_terms.split('\n'))
+        terms = sorted(collected)
+        suggestion_cache.set('terms', terms)
+    return terms
+
+
+def precedent_row(data):
+    """Build an insertable precedent mapping from submitted fields.
+
+    Missing keywords default to an empty string, as they always have for
+    single creates. Raises KeyError for a missing required field and
+    ValueError for a year that is not an integer.
+    """
+    row = {field: data[field] for field in REQUIRED_FIELDS}
+    row['year'] = int(row['year'])
+    row['keywords'] = ''
+    row.update((field, data[field]) for field in OPTIONAL_FIELDS if field in data)
+    return row
 
 
 @app.route('/api/precedent', methods=['POST'])
 def create_precedent():
-    """Create a new precedent (for admin/API use)."""
-    data = request.get_json()
+    """Create a new precedent, or several from a JSON array (for admin/API use)."""
+    data = request.get_json(silent=True)
+    records = data if isinstance(data, list) else [data]
     
     # Validate required fields
-    required_fields = ['title', 'case_number', 'year', 'court', 'description']
-    if not all(field in data for field in required_fields):
-        return jsonify({'error': 'Missing required fields'}), 400
+    if not records or not all(
+        isinstance(record, dict) and all(field in record for field in REQUIRED_FIELDS)
+        for record in records
+    ):
+        return error_response(ERROR_MISSING_FIELDS, 400)
+    if len(records) > MAX_BULK_PRECEDENTS:
+        return error_response(ERROR_TOO_MANY_PRECEDENTS, 400)
     
     try:
-        precedent = Precedent(
-            title=data['title'],
-            case_number=data['case_number'],
-            year=int(data['year']),
-            court=data['court'],
-            description=data['description'],
-            keywords=data.get('keywords', '')
-        )
+        if isinstance(data, list):
+            # One transaction and one executemany per batch for the whole array
+            ids = bulk_insert_precedents([precedent_row(record) for record in records])
+            invalidate_caches()
+            return jsonify({'ids': ids}), 201
+        
+        precedent = Precedent(**precedent_row(data))
         db.session.add(precedent)
         db.session.commit()
+        invalidate_caches()
         return jsonify(precedent.to_dict()), 201
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
 
+# The court breakdown is capped to the busiest courts so /stats stays bounded
+MAX_STATS_COURTS = 100
+TOP_COURTS = (
+    db.select(Precedent.court, db.func.count().label('count'))
+    .group_by(Precedent.court)
+    .order_by(db.func.count().desc())
+    .limit(MAX_STATS_COURTS)
+    .subquery()
+)
+
+# Per-year and per-court counts in one round-trip, tagged by kind. Year is
+# never NULL, so the year counts also sum to the total and no separate
+# COUNT(*) scan is needed. Rows are fetched in batches (and streamed from a
+# server-side cursor where the driver supports it) instead of being buffered.
+STATS_QUERY = db.union_all(
+    db.select(db.literal('year'), db.cast(Precedent.year, db.String), db.func.count())
+    .group_by(Precedent.year),
+    db.select(db.literal('court'), TOP_COURTS.c.court, TOP_COURTS.c.count),
+).execution_options(yield_per=512)
+
+# PostgreSQL computes both breakdowns in a single scan with GROUPING SETS;
+# court rows have a NULL year and are capped in Python
+STATS_GROUPING_QUERY = (
+    db.select(Precedent.year, Precedent.court, db.func.count())
+    .group_by(db.func.grouping_sets(Precedent.year, Precedent.court))
+    .execution_options(yield_per=512)
+)
+
+
 @app.route('/stats')
 def stats():
     """Get statistics about the database."""
-    count = Precedent.query.count()
-    years = db.session.query(db.func.count(Precedent.id), Precedent.year).group_by(Precedent.year).all()
-    courts = db.session.query(db.func.count(Precedent.id), Precedent.court).group_by(Precedent.court).all()
+    payload = stats_cache.get('stats')
+    if payload is None:
+        by_year, by_court = [], []
+        if db.engine.dialect.name == 'postgresql':
+            for year, court, count in db.session.execute(STATS_GROUPING_QUERY):
+                if year is None:
+                    by_court.append({'court': court, 'count': count})
+                else:
+                    by_year.append({'year': year, 'count': count})
+        else:
+            for kind, value, count in db.session.execute(STATS_QUERY):
+                if kind == 'year':
+                    by_year.append({'year': int(value), 'count': count})
+                else:
+                    by_court.append({'court': value, 'count': count})
+        
+        by_year.sort(key=operator.itemgetter('year'))
+        payload = {
+            'total_precedents': sum(row['count'] for row in by_year),
+            'by_year': by_year,
+            'by_court': heapq.nlargest(MAX_STATS_COURTS, by_court, key=operator.itemgetter('count')),
+        }
+        stats_cache.set('stats', payload)
     
-    return jsonify({
-        'total_precedents': count,
-        'by_year': [{'year': year, 'count': count} for count, year in years],
-        'by_court': [{'court': court, 'count': count} for count, court in courts]
-    })
+    return jsonify(payload)
 
 
 @app.errorhandler(404)
 def not_found(error):
     """Handle 404 errors."""
-    return jsonify({'error': 'Resource not found'}), 404
+    return error_response(ERROR_NOT_FOUND, 404)
 
 
 @app.errorhandler(500)
 def server_error(error):
     """Handle 500 errors."""
-    return jsonify({'error': 'Internal server error'}), 500
+    return error_response(ERROR_SERVER, 500)
+
+
+def bulk_insert_precedents(rows, batch_size=500):
+    """Insert precedent mappings in batches within a single transaction.
 
+    Each batch is one Core executemany against the table, bypassing ORM
+    unit-of-work bookkeeping entirely.
 
-def init_db():
-    """Initialize the database with sample data."""
+    Returns the ids of the new rows, in the order the rows were given.
+    """
+    table = Precedent.__table__
+    # Databases without multi-row RETURNING (e.g. MySQL) insert row by row
+    returning = db.engine.dialect.insert_executemany_returning_sort_by_parameter_order
+    insert = db.insert(table)
+    if returning:
+        insert = insert.returning(table.c.id, sort_by_parameter_order=True)
+    # executemany needs every row to bind the same parameters
+    optional = dict.fromkeys(OPTIONAL_FIELDS)
+    ids = []
+    with db.session.no_autoflush:
+        for start in range(0, len(rows), batch_size):
+            batch = [{**optional, **row} for row in rows[start:start + batch_size]]
+            # Core inserts skip the ORM events, so derive the terms here
+            for row in batch:
+                row['suggest_terms'] = extract_suggest_terms(
+                    row['title'], row['keywords'], row['section'], row['article']
+                )
+            if returning:
+                ids.extend(db.session.execute(insert, batch).scalars())
+            else:
+                ids.extend(db.session.execute(insert, row).inserted_primary_key[0] for row in batch)
+    db.session.commit()
+    return ids
+
+
+def init_db(reset=None):
+    """Create any missing tables and indexes, and seed an empty database with sample data.
+
+    Existing data is kept unless ``reset`` is true (by default, when the
+    RESET_DB environment variable is ``1``), which drops everything first.
+    """
+    if reset is None:
+        reset = os.getenv('RESET_DB') == '1'
+    
     with app.app_context():
-        db.drop_all()
+        if reset:
+            db.drop_all()
+            drop_search_index()
+        # These only create what is missing
         db.create_all()
+        upgrade_schema()
+        create_search_index()
+        if db.engine.dialect.name == 'sqlite':
+            # Redundant there with the unique title index; older versions made it
+            db.session.execute(db.text("DROP INDEX IF EXISTS ix_precedent_title_id"))
+            db.session.commit()
 
         # Check if data already exists
-        if Precedent.query.first():
+        if db.session.execute(db.select(Precedent.id).limit(1)).first():
             return
         
         # Add sample precedents (Indian Legal System)
         sample_precedents = [
             # Constitutional Law
-            Precedent(
+            dict(
                 title="Kesavananda Bharati v. State of Kerala",
                 case_number="1973-SC-001",
                 year=1973,
@@ -252,7 +934,7 @@ def init_db():
                 section="Article 368",
                 article="Article 368"
             ),
-            Precedent(
+            dict(
                 title="Maneka Gandhi v. Union of India",
                 case_number="1978-SC-002",
                 year=1978,
@@ -262,7 +944,7 @@ def init_db():
                 section="Article 21",
                 article="Article 21"
             ),
-            Precedent(
+            dict(
                 title="State of Kerala v. N.M. Thomas",
                 case_number="1976-SC-011",
                 year=1976,
@@ -272,7 +954,7 @@ def init_db():
                 section="Article 14",
                 article="Article 14"
             ),
-            Precedent(
+            dict(
                 title="Indira Gandhi v. Raj Narain",
                 case_number="1975-SC-005",
                 year=1975,
@@ -282,7 +964,7 @@ def init_db():
                 section="Article 329",
                 article="Article 19"
             ),
-            Precedent(
+            dict(
                 title="State of Karnataka v. Union of India",
                 case_number="1977-SC-006",
                 year=1977,
@@ -292,7 +974,7 @@ def init_db():
                 section="Article 16",
                 article="Article 16"
             ),
-            Precedent(
+            dict(
                 title="Minerva Mills Ltd. v. Union of India",
                 case_number="1980-SC-012",
                 year=1980,
@@ -302,7 +984,7 @@ def init_db():
                 section="Article 32",
                 article="Article 32"
             ),
-            Precedent(
+            dict(
                 title="Commissioner, Hindu Religious Endowments v. Sri Lakshmindra Thirtha Swamiar",
                 case_number="1954-SC-013",
                 year=1954,
@@ -314,7 +996,7 @@ def init_db():
             ),
 
             # Criminal Law (IPC)
-            Precedent(
+            dict(
                 title="Vishaka v. State of Rajasthan",
                 case_number="1997-SC-003",
                 year=1997,
@@ -324,7 +1006,7 @@ def init_db():
                 section="Section 509 IPC",
                 article="Article 15"
             ),
-            Precedent(
+            dict(
                 title="State of Maharashtra v. Madhukar Narayan Mardikar",
                 case_number="1991-SC-007",
                 year=1991,
@@ -334,7 +1016,7 @@ def init_db():
                 section="Section 302 IPC",
                 article="Article 21"
             ),
-            Precedent(
+            dict(
                 title="Sachin v. State of Madhya Pradesh",
                 case_number="2006-SC-008",
                 year=2006,
@@ -346,7 +1028,7 @@ def init_db():
             ),
 
             # Civil Law
-            Precedent(
+            dict(
                 title="K. Kamaraj v. State of Tamil Nadu",
                 case_number="1971-SC-004",
                 year=1971,
@@ -356,7 +1038,7 @@ def init_db():
                 section="Section 123(7) RPA",
                 article="Article 19"
             ),
-            Precedent(
+            dict(
                 title="Union of India v. Association for Democratic Reforms",
                 case_number="2002-SC-009",
                 year=2002,
@@ -368,7 +1050,7 @@ def init_db():
             ),
 
             # Evidence Law
-            Precedent(
+            dict(
                 title="Ram Narain v. State of U.P.",
                 case_number="1973-SC-010",
                 year=1973,
@@ -380,7 +1062,7 @@ def init_db():
             ),
 
             # Civil Procedure (CPC) - Various Orders
-            Precedent(
+            dict(
                 title="Dorab Cawasji Warden v. Coomi Sorab Warden",
                 case_number="1990-SC-014",
                 year=1990,
@@ -390,7 +1072,7 @@ def init_db():
                 section="Order 39 Rule 1 CPC",
                 article="Article 226"
             ),
-            Precedent(
+            dict(
                 title="Syed Abdul Khader v. Rami Reddy",
                 case_number="1979-SC-027",
                 year=1979,
@@ -400,7 +1082,7 @@ def init_db():
                 section="Order 21 Rule 1 CPC",
                 article="Article 226"
             ),
-            Precedent(
+            dict(
                 title="Sushil Kumar v. Rakesh Kumar",
                 case_number="2003-SC-028",
                 year=2003,
@@ -410,7 +1092,7 @@ def init_db():
                 section="Order 14 Rule 1 CPC",
                 article="Article 226"
             ),
-            Precedent(
+            dict(
                 title="B.V. Nagaraju v. State of Karnataka",
                 case_number="2007-SC-029",
                 year=2007,
@@ -420,7 +1102,7 @@ def init_db():
                 section="Order 18 Rule 1 CPC",
                 article="Article 21"
             ),
-            Precedent(
+            dict(
                 title="K. Venkataramiah v. A. Seetharama Reddy",
                 case_number="2006-SC-030",
                 year=2006,
@@ -430,7 +1112,7 @@ def init_db():
                 section="Order 41 Rule 1 CPC",
                 article="Article 226"
             ),
-            Precedent(
+            dict(
                 title="Shah Babulal Khimji v. Jayaben D. Kania",
                 case_number="1981-SC-015",
                 year=1981,
@@ -442,7 +1124,7 @@ def init_db():
             ),
 
             # Criminal Procedure (CrPC)
-            Precedent(
+            dict(
                 title="State of Rajasthan v. Balchand",
                 case_number="1977-SC-016",
                 year=1977,
@@ -452,7 +1134,7 @@ def init_db():
                 section="Section 438 CrPC",
                 article="Article 21"
             ),
-            Precedent(
+            dict(
                 title="Ram Prasad v. State of U.P.",
                 case_number="1974-SC-017",
                 year=1974,
@@ -464,7 +1146,7 @@ def init_db():
             ),
 
             # Limitation Act
-            Precedent(
+            dict(
                 title="Consolidated Engineering Enterprises v. Principal Secretary, Irrigation Department",
                 case_number="2008-SC-018",
                 year=2008,
@@ -476,7 +1158,7 @@ def init_db():
             ),
 
             # Arbitration Law
-            Precedent(
+            dict(
                 title="Bharat Aluminium Co. v. Kaiser Aluminium Technical Services Inc.",
                 case_number="2012-SC-019",
                 year=2012,
@@ -488,7 +1170,7 @@ def init_db():
             ),
 
             # More CrPC Sections
-            Precedent(
+            dict(
                 title="Abhinandan Jha v. Dinesh Mishra",
                 case_number="1968-SC-020",
                 year=1968,
@@ -500,7 +1182,7 @@ def init_db():
             ),
 
             # Family Law - Hindu Marriage Act
-            Precedent(
+            dict(
                 title="Naveen Kohli v. Neelu Kohli",
                 case_number="2006-SC-021",
                 year=2006,
@@ -512,7 +1194,7 @@ def init_db():
             ),
 
             # Contract Law - Indian Contract Act
-            Precedent(
+            dict(
                 title="Murlidhar Chiranjilal v. Harishchandra Dwarkadas",
                 case_number="1962-SC-022",
                 year=1962,
@@ -524,7 +1206,7 @@ def init_db():
             ),
 
             # Property Law - Transfer of Property Act
-            Precedent(
+            dict(
                 title="T. Lakshmipathi v. P. Nithyananda Reddy",
                 case_number="2003-SC-023",
                 year=2003,
@@ -536,7 +1218,7 @@ def init_db():
             ),
 
             # Company Law - Companies Act
-            Precedent(
+            dict(
                 title="Vodafone International Holdings BV v. Union of India",
                 case_number="2012-SC-024",
                 year=2012,
@@ -548,7 +1230,7 @@ def init_db():
             ),
 
             # Consumer Protection - Consumer Protection Act
-            Precedent(
+            dict(
                 title="Indian Medical Association v. V.P. Shantha",
                 case_number="1995-SC-025",
                 year=1995,
@@ -560,7 +1242,7 @@ def init_db():
             ),
 
             # Labour Law - Industrial Disputes Act
-            Precedent(
+            dict(
                 title="Workmen of Dimakuchi Tea Estate v. Dimakuchi Tea Estate",
                 case_number="1958-SC-026",
                 year=1958,
@@ -572,10 +1254,10 @@ def init_db():
             ),
         ]
         
-        for precedent in sample_precedents:
-            db.session.add(precedent)
-        
-        db.session.commit()
+        bulk_insert_precedents(sample_precedents)
+
+        # The triggers indexed every row; compact the index for reads
+        optimize_search_index()
         print("Database initialized with sample data.")
 
 
@@ -583,5 +1265,10 @@ if __name__ == '__main__':
     # Initialize database
     init_db()
     
-    # Run the Flask application
-    app.run(debug=True, host='0.0.0.0', port=5000)
+    # The Werkzeug server is single-process and for development only;
+    # production deployments serve wsgi:application under gunicorn
+    if os.getenv('FLASK_ENV') == 'development':
+        app.run(debug=True, host='0.0.0.0', port=5000)
+    else:
+        print("Set FLASK_ENV=development to use the dev server, or run: "
+              "gunicorn wsgi:application")
@@ -0,0 +1,28 @@
+"""
+Gunicorn configuration for the Precedent Finder application.
+
+Picked up automatically when gunicorn is started from the project root:
+    gunicorn wsgi:application
+"""
+
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+bind = os.getenv('BIND', '0.0.0.0:5000')
+
+# Import the app (and run init_db()) once in the master, before forking
+preload_app = True
+
+# Threads keep a worker busy while it waits on the database
+worker_class = 'gthread'
+threads = 8
+
+# One worker per core; SQLite serializes writes, so a single worker with
+# more threads serves it better than several competing processes
+if os.getenv('DATABASE_URL', 'sqlite:///precedents.db').startswith('sqlite'):
+    workers = 1
+    threads = 16
+else:
+    workers = os.cpu_count() or 1
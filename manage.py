@@ -4,8 +4,12 @@ CLI tool for managing the Precedent Finder database.
 """
 
 import argparse
+import json
 import sys
-from app import app, db, Precedent
+from app import (
+    app, db, Precedent, search_statement, bulk_insert_precedents, precedent_row, init_db
+)
+from utils import normalize_query
 
 
 def add_precedent(title, case_number, year, court, description, keywords=''):
@@ -30,10 +34,29 @@ def add_precedent(title, case_number, year, court, description, keywords=''):
             return False
 
 
+def import_precedents(path):
+    """Add every precedent in a JSON file (an array of objects) in one transaction."""
+    with app.app_context():
+        try:
+            with open(path) as f:
+                records = json.load(f)
+            ids = bulk_insert_precedents([precedent_row(record) for record in records])
+            print(f"✓ Successfully added {len(ids)} precedents from {path}")
+            return True
+        except Exception as e:
+            db.session.rollback()
+            print(f"✗ Error adding precedents: {e}")
+            return False
+
+
 def list_precedents():
     """List all precedents in the database."""
     with app.app_context():
-        precedents = Precedent.query.all()
+        # Plain rows of just the listed columns; no ORM objects are built
+        precedents = db.session.execute(
+            db.select(Precedent.id, Precedent.title, Precedent.year, Precedent.court)
+            .order_by(Precedent.id)
+        ).all()
         if not precedents:
             print("No precedents found in database.")
             return
@@ -67,15 +90,14 @@ def delete_precedent(precedent_id):
 
 def search_precedents(query):
     """Search for precedents."""
+    query = normalize_query(query)
+    if not query:
+        print("Search query is empty.")
+        return
+    
     with app.app_context():
-        results = Precedent.query.filter(
-            db.or_(
-                Precedent.title.ilike(f'%{query}%'),
-                Precedent.description.ilike(f'%{query}%'),
-                Precedent.keywords.ilike(f'%{query}%'),
-                Precedent.case_number.ilike(f'%{query}%')
-            )
-        ).all()
+        stmt, params = search_statement(query)
+        results = db.session.execute(stmt, params).all()
         
         if not results:
             print(f"No results found for: {query}")
@@ -99,13 +121,22 @@ def main():
     )
     subparsers = parser.add_subparsers(dest='command', help='Available commands')
     
+    # Init command
+    init_parser = subparsers.add_parser(
+        'init', help='Create missing tables and seed an empty database'
+    )
+    init_parser.add_argument(
+        '--reset', action='store_true', help='Drop all existing data first'
+    )
+    
     # Add command
     add_parser = subparsers.add_parser('add', help='Add a new precedent')
-    add_parser.add_argument('--title', required=True, help='Case title')
-    add_parser.add_argument('--case-number', required=True, help='Case number')
-    add_parser.add_argument('--year', required=True, help='Year')
-    add_parser.add_argument('--court', required=True, help='Court name')
-    add_parser.add_argument('--description', required=True, help='Case description')
+    add_parser.add_argument('--file', help='JSON file with an array of precedents to add')
+    add_parser.add_argument('--title', help='Case title')
+    add_parser.add_argument('--case-number', help='Case number')
+    add_parser.add_argument('--year', help='Year')
+    add_parser.add_argument('--court', help='Court name')
+    add_parser.add_argument('--description', help='Case description')
     add_parser.add_argument('--keywords', default='', help='Keywords (comma-separated)')
     
     # List command
@@ -121,7 +152,16 @@ def main():
     
     args = parser.parse_args()
     
-    if args.command == 'add':
+    if args.command == 'init':
+        init_db(reset=args.reset or None)
+    elif args.command == 'add' and args.file:
+        import_precedents(args.file)
+    elif args.command == 'add':
+        required = ('title', 'case_number', 'year', 'court', 'description')
+        missing = [name for name in required if getattr(args, name) is None]
+        if missing:
+            add_parser.error('the following arguments are required without --file: '
+                             + ', '.join('--' + name.replace('_', '-') for name in missing))
         add_precedent(
             args.title,
             args.case_number,
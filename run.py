@@ -1,9 +1,17 @@
 """
-Entry point for running the Precedent Finder application.
+Entry point for running the Precedent Finder application in development.
+
+Production deployments serve wsgi:application under gunicorn instead
+(see gunicorn.conf.py).
 """
 
+import os
 from app import app, init_db
 
 if __name__ == '__main__':
     init_db()
-    app.run(debug=True, host='0.0.0.0', port=8000)
+    # The Werkzeug server is single-process and for development only
+    if os.getenv('FLASK_ENV') == 'development':
+        app.run(debug=True, host='0.0.0.0', port=8000)
+    else:
+        print("Set FLASK_ENV=development to use the dev server, or run: gunicorn wsgi:application")
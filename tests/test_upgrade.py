@@ -0,0 +1,116 @@
+"""
+Tests for upgrading a database created by an earlier version.
+"""
+
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+# app builds its engine at import time, so point it at a scratch database first
+DB_DIR = tempfile.mkdtemp()
+DB_PATH = os.path.join(DB_DIR, 'precedents.db')
+os.environ['DATABASE_URL'] = f'sqlite:///{DB_PATH}'
+os.environ.pop('RESET_DB', None)
+
+from app import app, db, init_db, Precedent  # noqa: E402
+
+# The precedent table as the first release created it: no search_blob or
+# suggest_terms, and timestamps without server defaults
+BASELINE_SCHEMA = """
+CREATE TABLE precedent (
+    id INTEGER NOT NULL,
+    title VARCHAR(255) NOT NULL,
+    case_number VARCHAR(100) NOT NULL,
+    year INTEGER NOT NULL,
+    court VARCHAR(200) NOT NULL,
+    description TEXT NOT NULL,
+    keywords VARCHAR(500),
+    section VARCHAR(100),
+    article VARCHAR(100),
+    created_at DATETIME,
+    updated_at DATETIME,
+    PRIMARY KEY (id),
+    UNIQUE (title)
+)
+"""
+
+EXISTING_ROWS = [
+    (1, 'Kesavananda Bharati v. State of Kerala', '1973-SC-001', 1973,
+     'Supreme Court of India', 'Basic Structure Doctrine.', 'basic structure',
+     'Article 368', 'Article 368', '2020-01-01 10:00:00.000000', '2021-06-01 12:30:00.000000'),
+    (2, 'Maneka Gandhi v. Union of India', '1978-SC-002', 1978,
+     'Supreme Court of India', 'Right to travel abroad.', 'right to life, personal liberty',
+     'Article 21', 'Article 21', '2020-02-01 09:00:00.000000', '2022-03-15 08:45:00.000000'),
+]
+
+NEW_PRECEDENT = {
+    'title': 'Indra Sawhney v. Union of India',
+    'case_number': '1992-SC-003',
+    'year': 1992,
+    'court': 'Supreme Court of India',
+    'description': 'Upheld reservations with a fifty percent ceiling.',
+}
+
+
+class UpgradeBaselineDatabaseTestCase(unittest.TestCase):
+    """init_db() on a precedent table created by the first release."""
+
+    @classmethod
+    def setUpClass(cls):
+        connection = sqlite3.connect(DB_PATH)
+        with connection:
+            connection.execute(BASELINE_SCHEMA)
+            connection.executemany(
+                'INSERT INTO precedent VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                EXISTING_ROWS,
+            )
+        connection.close()
+        init_db(reset=False)
+        cls.client = app.test_client()
+
+    @classmethod
+    def tearDownClass(cls):
+        with app.app_context():
+            db.engine.dispose()
+        shutil.rmtree(DB_DIR, ignore_errors=True)
+
+    def fetch_timestamps(self, title):
+        connection = sqlite3.connect(DB_PATH)
+        try:
+            return connection.execute(
+                'SELECT created_at, updated_at FROM precedent WHERE title = ?', (title,)
+            ).fetchone()
+        finally:
+            connection.close()
+
+    def test_existing_updated_at_unchanged(self):
+        for row in EXISTING_ROWS:
+            self.assertEqual(self.fetch_timestamps(row[1]), (row[9], row[10]))
+
+    def test_suggest_terms_backfilled(self):
+        with app.app_context():
+            terms = db.session.execute(
+                db.select(Precedent.suggest_terms).where(Precedent.id == 2)
+            ).scalar_one()
+        self.assertIn('personal liberty', terms.split('\n'))
+
+    def test_single_insert_sets_timestamps(self):
+        response = self.client.post('/api/precedent', json=NEW_PRECEDENT)
+        self.assertEqual(response.status_code, 201)
+        created_at, updated_at = self.fetch_timestamps(NEW_PRECEDENT['title'])
+        self.assertIsNotNone(created_at)
+        self.assertIsNotNone(updated_at)
+
+    def test_bulk_insert_sets_timestamps(self):
+        record = dict(NEW_PRECEDENT, title='Vishaka v. State of Rajasthan')
+        response = self.client.post('/api/precedent', json=[record])
+        self.assertEqual(response.status_code, 201)
+        created_at, updated_at = self.fetch_timestamps(record['title'])
+        self.assertIsNotNone(created_at)
+        self.assertIsNotNone(updated_at)
+
+
+if __name__ == '__main__':
+    unittest.main()
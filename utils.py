@@ -2,66 +2,410 @@
 Utility functions for the Precedent Finder application.
 """
 
+import base64
+import bisect
+import functools
+import html
+import itertools
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
 
-def sanitize_search_query(query):
+
+@functools.lru_cache(maxsize=1024)
+def normalize_query(query):
     """
-    Sanitize search query to prevent SQL injection.
+    Normalize whitespace in a search query.
+    
+    This only trims and collapses whitespace; it is not an escaping step.
+    Queries reach SQL as bound parameters, and LIKE patterns are escaped
+    separately by escape_like().
+    
+    Results are memoized per process, since the same queries recur across
+    pages and refreshes; call normalize_query.cache_clear() to reset.
     
     Args:
         query (str): Raw search query
         
     Returns:
-        str: Sanitized search query
+        str: Normalized search query
     """
+    # Fast path: most queries are already clean, so return them as is. The
+    # only whitespace isprintable() allows is the ASCII space.
+    if (query.isprintable() and '  ' not in query
+            and not query.startswith(' ') and not query.endswith(' ')):
+        return query
+    
     # Remove leading/trailing whitespace
     query = query.strip()
     
-    # Remove multiple spaces
+    # Remove multiple spaces. split()/join() runs several times faster
+    # than a precompiled r'\s+' sub (or a translate() table plus a sub) at
+    # every query length up to the cap, and it handles all Unicode
+    # whitespace, not just ASCII.
     query = ' '.join(query.split())
     
     return query
 
 
+def normalize_queries(queries):
+    """
+    Normalize a batch of search queries, e.g. when reprocessing a query log.
+    
+    The memo cache of normalize_query() is bypassed, so a large batch of
+    one-off queries does not evict the ones interactive searches repeat.
+    
+    Args:
+        queries (iterable): Raw search queries
+        
+    Returns:
+        list: Normalized queries, in the same order
+    """
+    normalize = normalize_query.__wrapped__
+    return [normalize(query) for query in queries]
+
+
+def escape_like(value):
+    """
+    Escape LIKE wildcards so a value is matched literally.
+    
+    Use with ``escape='\\'`` on the ``like``/``ilike`` call.
+    
+    Args:
+        value (str): Raw value to embed in a LIKE pattern
+        
+    Returns:
+        str: Value with ``\\``, ``%`` and ``_`` escaped
+    """
+    return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def build_fts_query(query):
+    """
+    Convert a search query into an SQLite FTS5 MATCH expression.
+    
+    Every token is quoted so punctuation is not parsed as FTS5 syntax,
+    and turned into a prefix search. Tokens are implicitly ANDed.
+    
+    Args:
+        query (str): Sanitized search query
+        
+    Returns:
+        str: FTS5 query expression
+    """
+    return ' '.join(
+        '"{}"*'.format(token.replace('"', '""'))
+        for token in query.split()
+    )
+
+
+def encode_cursor(values):
+    """
+    Encode keyset pagination values as an opaque, URL-safe cursor.
+    
+    Args:
+        values (list): JSON-serializable position of the last row served
+        
+    Returns:
+        str: Cursor token
+    """
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """
+    Decode a cursor produced by encode_cursor().
+    
+    Args:
+        token (str): Cursor token
+        
+    Returns:
+        The decoded position values
+        
+    Raises:
+        ValueError: If the token is malformed
+    """
+    padded = token + '=' * (-len(token) % 4)
+    return json.loads(base64.urlsafe_b64decode(padded.encode()))
+
+
+def complete_prefix(terms, prefix, limit):
+    """
+    List the terms starting with prefix, using binary search on a sorted list.
+    
+    Args:
+        terms (list): Sorted, de-duplicated terms
+        prefix (str): Prefix to complete
+        limit (int): Maximum number of terms returned
+        
+    Returns:
+        list: Up to limit matching terms, in sorted order
+    """
+    # Terms sharing the prefix sit in one contiguous run starting at lo
+    lo = bisect.bisect_left(terms, prefix)
+    completions = []
+    for term in terms[lo:lo + limit]:
+        if not term.startswith(prefix):
+            break
+        completions.append(term)
+    return completions
+
+
+# Matches a single word character, for deciding where terms need boundaries
+_WORD_CHAR = re.compile(r'\w')
+
+# The entities html.escape() produces
+_HTML_ENTITY = r'&(?:amp|lt|gt|quot|#x27);'
+
+# Longest text whose highlighted result is memoized: a few search snippets'
+# worth, so the 1024-entry cache stays within a few megabytes even though
+# escaping and <mark> tags grow each result past its text
+MAX_CACHED_HIGHLIGHT_LENGTH = 512
+
+
 def highlight_search_terms(text, terms):
     """
     Highlight search terms in text.
     
+    The whole text is HTML-escaped and terms are matched against the
+    escaped text, so the result is safe to insert as markup.
+    
+    Results for texts up to MAX_CACHED_HIGHLIGHT_LENGTH are memoized, since
+    the same snippets are re-highlighted across pages and filter changes;
+    call highlight_search_terms.cache_clear() to reset.
+    
     Args:
-        text (str): Text to highlight
+        text (str): Plain text to highlight
         terms (list): List of terms to highlight
         
     Returns:
-        str: HTML with highlighted terms
+        str: Escaped HTML with highlighted terms
     """
-    highlighted = text
-    for term in terms:
-        highlighted = highlighted.replace(
-            term,
-            f'<mark>{term}</mark>'
-        )
-    return highlighted
+    terms = frozenset(html.escape(term) for term in terms if term)
+    if not terms:
+        return html.escape(text)
+    if len(text) > MAX_CACHED_HIGHLIGHT_LENGTH:
+        return _highlight(text, terms)
+    return _cached_highlight(text, terms)
 
 
-def paginate_results(results, page=1, per_page=20):
+def _highlight(text, terms):
+    """
+    Escape text and highlight a non-empty set of escaped terms in it.
+    
+    Args:
+        text (str): Plain text to highlight
+        terms (frozenset): Non-empty, HTML-escaped terms to highlight
+        
+    Returns:
+        str: Escaped HTML with highlighted terms
+    """
+    text = html.escape(text)
+    # No term can match unless the text contains one of their first
+    # characters; isdisjoint() scans in C and stops at the first hit
+    if _first_chars(terms).isdisjoint(text):
+        return text
+    # One pass over the text; inserted <mark> tags are never re-matched, and
+    # entities that no term matches are skipped whole rather than split
+    fragments = _mark_fragments(terms)
+    return _terms_pattern(terms).sub(
+        lambda match: fragments.get(match.group(), match.group()), text
+    )
+
+
+_cached_highlight = functools.lru_cache(maxsize=1024)(_highlight)
+highlight_search_terms.cache_clear = _cached_highlight.cache_clear
+
+
+@functools.lru_cache(maxsize=256)
+def _first_chars(terms):
+    """
+    Collect the characters any of the terms can start with.
+    
+    Args:
+        terms (frozenset): Non-empty terms to highlight
+        
+    Returns:
+        frozenset: First character of each term
+    """
+    return frozenset(term[0] for term in terms)
+
+
+@functools.lru_cache(maxsize=256)
+def _mark_fragments(terms):
+    """
+    Build the <mark> replacement for each term.
+    
+    Args:
+        terms (frozenset): HTML-escaped terms to highlight
+        
+    Returns:
+        dict: Replacement HTML keyed by term
+    """
+    return {term: f'<mark>{term}</mark>' for term in terms}
+
+
+@functools.lru_cache(maxsize=256)
+def _terms_pattern(terms):
+    """
+    Compile a single pattern matching any of the given terms.
+    
+    Terms only match as whole words: a term that starts or ends with a
+    word character cannot match next to another word character, so "art"
+    does not match inside "start". Longer terms are tried first, so where
+    terms overlap the longest one wins at each position. The text is
+    escaped HTML, so an entity no term starts with is matched last, as a
+    whole, to keep terms like "amp" or ";" from matching inside it.
+    
+    Args:
+        terms (frozenset): Non-empty, HTML-escaped terms to match literally
+        
+    Returns:
+        re.Pattern: Compiled alternation of the terms
+    """
+    alternatives = []
+    for term in sorted(terms, key=lambda term: (-len(term), term)):
+        # A plain \b would demand a word character at edges like "(1)"
+        head = r'(?<!\w)' if _WORD_CHAR.match(term[0]) else ''
+        tail = r'(?!\w)' if _WORD_CHAR.match(term[-1]) else ''
+        alternatives.append(head + re.escape(term) + tail)
+    alternatives.append(_HTML_ENTITY)
+    return re.compile('|'.join(alternatives))
+
+
+@dataclass(frozen=True)
+class Page:
+    """
+    One page of results with its pagination metadata.
+    
+    Slotted, so each instance is a fraction of the size of the equivalent
+    dict; use to_dict() where a JSON-ready mapping is needed.
+    """
+    __slots__ = ('results', 'total', 'page', 'pages', 'per_page')
+
+    results: object
+    total: int
+    page: int
+    pages: int
+    per_page: int
+
+    def to_dict(self):
+        """
+        Convert the page to a dictionary.
+        
+        Returns:
+            dict: Results and metadata keyed by field name
+        """
+        return {
+            'results': self.results,
+            'total': self.total,
+            'page': self.page,
+            'pages': self.pages,
+            'per_page': self.per_page
+        }
+
+
+# Largest page size paginate_results() will serve
+MAX_PAGINATE_PER_PAGE = 1000
+
+
+def paginate_results(results, page=1, per_page=20, lazy=False, total=None):
     """
     Paginate results list.
     
     Args:
-        results (list): List of results
-        page (int): Page number (1-indexed)
-        per_page (int): Results per page
+        results (list): List of results, or a fetch function called as
+            results(offset, limit) that loads only the requested page
+            (e.g. with LIMIT/OFFSET in SQL); a fetch function needs total
+        page (int): Page number (1-indexed), clamped to the available pages
+        per_page (int): Results per page, clamped to 1..MAX_PAGINATE_PER_PAGE
+        lazy (bool): Return the page as an iterator over results instead of
+            a copied list slice, for callers that only iterate it once
+        total (int): Number of results, if already known (e.g. from a COUNT
+            query); required when results is a fetch function or an
+            iterator without len()
         
     Returns:
-        dict: Paginated results with metadata
+        Page: Paginated results with metadata
     """
-    total = len(results)
+    if total is None:
+        total = len(results)
+    
+    # Clamp before any arithmetic so hostile values cannot produce huge
+    # offsets, and a negative page cannot wrap around to the list's tail
+    per_page = 1 if per_page < 1 else min(per_page, MAX_PAGINATE_PER_PAGE)
+    pages = -(-total // per_page)  # Ceiling division
+    page = 1 if page < 1 else min(page, max(pages, 1))
     start = (page - 1) * per_page
-    end = start + per_page
-    
-    return {
-        'results': results[start:end],
-        'total': total,
-        'page': page,
-        'pages': (total + per_page - 1) // per_page,
-        'per_page': per_page
-    }
+    
+    # A fetch function materializes only the page; iterators cannot be
+    # sliced, only consumed up to it
+    if callable(results):
+        page_results = results(start, per_page)
+    elif lazy or not hasattr(results, '__getitem__'):
+        page_results = itertools.islice(results, start, start + per_page)
+    else:
+        page_results = results[start:start + per_page]
+    
+    return Page(page_results, total, page, pages, per_page)
+
+
+class TTLCache:
+    """
+    Thread-safe LRU cache whose entries expire after a fixed timeout.
+    
+    Args:
+        maxsize (int): Maximum number of entries kept
+        ttl (float): Seconds an entry stays valid
+    """
+
+    def __init__(self, maxsize=1024, ttl=60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """
+        Return the cached value for key, or default if missing or expired.
+        
+        Args:
+            key: Cache key
+            default: Value returned on a miss
+            
+        Returns:
+            The cached value or default
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return default
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        """
+        Store value under key, evicting the least recently used entry if full.
+        
+        Args:
+            key: Cache key
+            value: Value to cache
+        """
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Remove every entry."""
+        with self._lock:
+            self._entries.clear()
+
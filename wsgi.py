@@ -0,0 +1,16 @@
+"""
+WSGI entry point for serving the Precedent Finder application.
+
+Serve it with gunicorn from the project root, which applies gunicorn.conf.py:
+    gunicorn wsgi:application
+"""
+
+from app import app, db, init_db
+
+# With preload_app this runs once in the gunicorn master, before workers fork.
+# Drop the master's pooled connections so each worker opens its own.
+init_db()
+with app.app_context():
+    db.engine.dispose()
+
+application = app